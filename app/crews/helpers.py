@@ -1,30 +1,148 @@
 import os
+from functools import lru_cache
+
+import httpx
 from dotenv import load_dotenv
-from langchain_groq import ChatGroq
+from crewai import BaseLLM
+from groq import AsyncGroq, Groq
 
 # Load environment variables
 load_dotenv()
 
-def get_llm():
+GROQ_CONTEXT_WINDOW = int(os.getenv("GROQ_CONTEXT_WINDOW", "8192"))
+
+# Per-call budget: (GROQ_MAX_RETRIES + 1) * GROQ_TIMEOUT must fit in CREW_TIMEOUT,
+# since crew threads outlive a timed-out request and keep calling Groq
+GROQ_TIMEOUT = float(os.getenv("GROQ_TIMEOUT", "30"))
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "1"))
+
+@lru_cache(maxsize=1)
+def get_http_client():
     """
-    Initialize and return an LLM instance.
-    
+    Return the shared HTTP client used for LLM calls.
+
+    CrewAI runs agents in worker threads, so LLM calls use a sync client.
+
+    Returns:
+        httpx.Client: Pooled HTTP/2 client reused across requests
+    """
+    return httpx.Client(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=100),
+    )
+
+@lru_cache(maxsize=1)
+def get_http_async_client():
+    """
+    Return the shared async HTTP client used for streaming LLM calls.
+
+    Returns:
+        httpx.AsyncClient: Pooled HTTP/2 client reused across requests
+    """
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=100),
+    )
+
+def get_groq_api_key():
+    groq_api_key = os.getenv("GROQ_API_KEY")
+    if not groq_api_key:
+        raise ValueError("GROQ_API_KEY environment variable is not set")
+    return groq_api_key
+
+@lru_cache(maxsize=1)
+def get_groq_client():
+    """
+    Return the shared Groq SDK client.
+
+    Returns:
+        Groq: Groq client backed by the shared HTTP client
+    """
+    return Groq(
+        api_key=get_groq_api_key(),
+        timeout=GROQ_TIMEOUT,
+        max_retries=GROQ_MAX_RETRIES,
+        http_client=get_http_client(),
+    )
+
+@lru_cache(maxsize=1)
+def get_async_groq_client():
+    """
+    Return the shared async Groq SDK client, used for token streaming.
+
     Returns:
-        ChatGroq: Configured Groq LLM instance (for now)
+        AsyncGroq: Groq client backed by the shared async HTTP client
+    """
+    return AsyncGroq(
+        api_key=get_groq_api_key(),
+        timeout=GROQ_TIMEOUT,
+        max_retries=GROQ_MAX_RETRIES,
+        http_client=get_http_async_client(),
+    )
+
+
+class GroqLLM(BaseLLM):
+    """
+    CrewAI LLM that calls Groq's chat completions API directly.
+
+    Skips the LiteLLM/LangChain layers; only plain chat is supported,
+    no native function calling.
+    """
+
+    def __init__(self, model, client, temperature=None):
+        super().__init__(model=model, temperature=temperature)
+        self.client = client
+
+    def call(
+        self,
+        messages,
+        tools=None,
+        callbacks=None,
+        available_functions=None,
+        from_task=None,
+        from_agent=None,
+    ):
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+
+        completion = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=self.temperature,
+            # Groq accepts at most 4 stop sequences
+            stop=self.stop[:4] or None,
+        )
+        return completion.choices[0].message.content
+
+    def supports_function_calling(self):
+        return False
+
+    def get_context_window_size(self):
+        return GROQ_CONTEXT_WINDOW
+
+
+@lru_cache(maxsize=None)
+def get_llm(model=None):
+    """
+    Initialize and return an LLM instance, once per model.
+
+    Args:
+        model (str, optional): Groq model name; defaults to GROQ_MODEL
+
+    Returns:
+        GroqLLM: Configured Groq LLM instance
+
+    Raises:
+        ValueError: If LLM_TYPE is not GROQ, the only supported backend
     """
     LLM_TYPE = os.getenv("LLM_TYPE", "GROQ")
-    if LLM_TYPE == "GROQ":
-        groq_api_key = os.getenv("GROQ_API_KEY")
-        groq_model = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
-        
-        if not groq_api_key:
-            raise ValueError("GROQ_API_KEY environment variable is not set")
-        
-        return ChatGroq(
-            groq_api_key=groq_api_key,
-            model_name=groq_model,
-            temperature=0.7,
-            max_tokens=None,
-            timeout=None,
-            max_retries=2,
-        )
\ No newline at end of file
+    if LLM_TYPE != "GROQ":
+        raise ValueError(f"Unsupported LLM_TYPE {LLM_TYPE!r}: only GROQ is supported")
+
+    groq_model = model or os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
+
+    return GroqLLM(
+        model=groq_model,
+        client=get_groq_client(),
+        temperature=0.7,
+    )
@@ -1,68 +1,154 @@
+import asyncio
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
 
-from crewai import Agent, Task, Crew, LLM
+from crewai import Agent, Task, Crew
+
+from app.crews.helpers import get_async_groq_client, get_groq_client, get_llm
 
 load_dotenv()
 
+# Groq model id for the crew and the stream; both call the Groq SDK directly,
+# so other LiteLLM providers are not supported and "groq/" is optional
 LLM_MODEL = os.getenv("LLM_MODEL", "groq/openai/gpt-oss-20b")
+# CrewAI's step-by-step console output is for debugging only
+VERBOSE = os.getenv("VERBOSE", "0") == "1"
 
-# Initialize an LLM
-llm = LLM(model=LLM_MODEL)
-
-qna_agent = Agent(
-    role="You are a helpful assistant named RICA",
-	goal="Be the most friendly and helpful "
-        "supportive assistant and concise with your answers",
-	backstory=(
-		"You work in Siam's (me) team as an assistant "
-        "and you need to help him with his questions and tasks "
-	),
-	allow_delegation=False,
-	verbose=True,
-	llm=llm
-)
+# The Groq SDK takes the bare model name, e.g. "openai/gpt-oss-20b"
+GROQ_MODEL_NAME = LLM_MODEL.removeprefix("groq/")
 
-"""support_quality_assurance_agent = Agent(
-	role="Support Quality Assurance Specialist",
-	goal="Make sure the assistant doesn't provide incorrect information ",
-	backstory=(
-		"You work in Siam's (me) team as a manager of a qna agent "
-	),
-	verbose=True,
-	llm=llm
-)"""
-
-inquiry_resolution = Task(
-    description=(
-        "{inquirer} asked: {inquiry}\n\n"
-        "Provide a brief. Be concise and to the point. "
-        "If it's a greeting, you must respond briefly and accordingly."
-    ),
-    expected_output=(
-        "A short, clear response that directly answers the question. "
-        "No lengthy explanations unless specifically requested. "
-        "For greetings, respond briefly and friendly."
-    ),
-    agent=qna_agent,
+QNA_ROLE = "You are a helpful assistant named RICA"
+QNA_GOAL = (
+    "Be the most friendly and helpful "
+    "supportive assistant and concise with your answers"
+)
+QNA_BACKSTORY = (
+    "You work in Siam's (me) team as an assistant "
+    "and you need to help him with his questions and tasks "
 )
 
-"""quality_assurance_review = Task(
-    description=(
-        "Check the assistant's response for accuracy and ensure it's concise. "
-        "If it's too verbose, make it shorter while keeping the key information."
-    ),
-    expected_output=(
-        "A brief, accurate final response. Keep it short and friendly. "
-        "Maximum 2-3 sentences unless the question specifically requires more detail."
-    ),
-    agent=support_quality_assurance_agent,
+# Static task instructions; the per-request header is prepended in
+# prepare_crew instead of going through CrewAI's input interpolation
+RESOLUTION_INSTRUCTIONS = (
+    "Provide a brief. Be concise and to the point. "
+    "If it's a greeting, you must respond briefly and accordingly."
 )
-"""
-
-qna_crew = Crew(
-  agents=[qna_agent],
-  tasks=[inquiry_resolution],
-  verbose=True,
-  memory=False
-)
\ No newline at end of file
+
+
+@lru_cache(maxsize=1)
+def get_qna_crew():
+    """
+    Build the QnA crew on first use, once per process.
+
+    Returns:
+        Crew: The single-task crew template
+    """
+    # Initialize an LLM
+    llm = get_llm(GROQ_MODEL_NAME)
+
+    qna_agent = Agent(
+        role=QNA_ROLE,
+        goal=QNA_GOAL,
+        backstory=QNA_BACKSTORY,
+        allow_delegation=False,
+        verbose=VERBOSE,
+        llm=llm
+    )
+
+    inquiry_resolution = Task(
+        description=RESOLUTION_INSTRUCTIONS,
+        expected_output=(
+            "A short, clear response that directly answers the question. "
+            "No lengthy explanations unless specifically requested. "
+            "For greetings, respond briefly and friendly."
+        ),
+        agent=qna_agent,
+    )
+
+    return Crew(
+        agents=[qna_agent],
+        tasks=[inquiry_resolution],
+        verbose=VERBOSE,
+        memory=False
+    )
+
+
+def prepare_crew(crew, header):
+    """
+    Copy a crew template with the request header prepended to its tasks.
+
+    Kick off the returned crew without inputs; the prompts are already
+    complete, so CrewAI skips its template interpolation.
+
+    Args:
+        crew (Crew): The crew template from get_qna_crew
+        header (str): Per-request text to put in front of the instructions
+
+    Returns:
+        Crew: A per-request copy of the crew
+    """
+    # Copy per request: tasks are mutated and must not be shared
+    crew = crew.copy()
+    for task in crew.tasks:
+        task.description = header + task.description
+    return crew
+
+
+async def run_qna(inquirer, inquiry):
+    """
+    Answer an inquiry with the QnA crew.
+
+    Args:
+        inquirer (str): The inquirer's name
+        inquiry (str): The question being asked
+
+    Returns:
+        str: The final answer
+    """
+    header = f"{inquirer} asked: {inquiry}\n\n"
+    result = await prepare_crew(get_qna_crew(), header).kickoff_async()
+    return result.raw
+
+
+async def stream_qna(inquirer, inquiry):
+    """
+    Stream an answer straight from Groq as it is generated.
+
+    The same single pass as run_qna (persona and instructions), minus
+    CrewAI's agent prompt scaffolding, so output can start right away.
+
+    Args:
+        inquirer (str): The inquirer's name
+        inquiry (str): The question being asked
+
+    Yields:
+        str: Content deltas in order
+    """
+    llm = get_llm(GROQ_MODEL_NAME)
+    stream = await get_async_groq_client().chat.completions.create(
+        model=llm.model,
+        messages=[
+            {"role": "system", "content": f"{QNA_ROLE}. {QNA_GOAL}. {QNA_BACKSTORY}"},
+            {"role": "user", "content": f"{inquirer} asked: {inquiry}\n\n{RESOLUTION_INSTRUCTIONS}"},
+        ],
+        temperature=llm.temperature,
+        stream=True,
+    )
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+async def warm_up_qna():
+    """
+    Build the crew and open the Groq connections ahead of the first request.
+
+    Lists models over both the sync (crew) and async (streaming) clients,
+    which costs no tokens but leaves a primed keep-alive connection each.
+    """
+    get_qna_crew()
+    await asyncio.gather(
+        asyncio.to_thread(get_groq_client().models.list),
+        get_async_groq_client().models.list(),
+    )
@@ -2,15 +2,37 @@
 FastAPI application for RICA - Rather Intelligent Conversational Assistant
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
-from typing import Dict, Any
+from datetime import datetime
+from typing import Dict
+import asyncio
+import logging
+import logging.handlers
+import os
+import queue
 import uvicorn
 
 # Import routers
+from app.crews.helpers import get_http_async_client, get_http_client
+from app.crews.qna import warm_up_qna
 from app.routes.manager.route import router as manager_router
 from app.routes.telegram.route import router as telegram_router
+from app.routes.telegram.route import CLIENT as telegram_client
+from app.routes.telegram.route import warm_up as warm_up_telegram
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "WARNING").upper()
+
+# Log records are handed to a background thread so handlers never block requests
+log_queue = queue.SimpleQueue()
+log_handler = logging.StreamHandler()
+log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+log_listener = logging.handlers.QueueListener(log_queue, log_handler)
+
+logger = logging.getLogger(__name__)
 
 # Create FastAPI instance
 app = FastAPI(
@@ -18,7 +40,8 @@ app = FastAPI(
     description="Rather Intelligent Conversational Assistant API",
     version="0.1.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -30,10 +53,66 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger responses (long LLM answers); tiny ones aren't worth it
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Include routers
 app.include_router(manager_router)
 app.include_router(telegram_router)
 
+# Keep references to fire-and-forget startup work so it isn't garbage collected
+startup_tasks: set[asyncio.Task] = set()
+
+@app.on_event("startup")
+async def start_log_listener():
+    """Start the log writer thread and route logging through it (per worker process)"""
+    # Installed together with its listener, so processes that never start up
+    # (gunicorn master, scripts) don't queue records nobody prints; force
+    # replaces any root handlers a library configured on import
+    log_listener.start()
+    logging.basicConfig(
+        level=LOG_LEVEL,
+        handlers=[logging.handlers.QueueHandler(log_queue)],
+        force=True,
+    )
+
+async def warm_up_connections():
+    """Prime LLM and Telegram connections so the first request skips the handshakes"""
+    results = await asyncio.gather(
+        warm_up_qna(),
+        warm_up_telegram(),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning("Connection warm-up failed: %r", result)
+
+@app.on_event("startup")
+async def start_warm_up():
+    """Warm up in the background; slow or failing upstreams must not delay serving"""
+    task = asyncio.create_task(warm_up_connections())
+    startup_tasks.add(task)
+    task.add_done_callback(startup_tasks.discard)
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    """Close pooled HTTP connections on shutdown"""
+    # Stop an unfinished warm-up before its clients go away
+    for task in startup_tasks:
+        task.cancel()
+    await telegram_client.aclose()
+    # The Groq pools are created lazily; don't open one just to close it
+    if get_http_async_client.cache_info().currsize:
+        await get_http_async_client().aclose()
+    if get_http_client.cache_info().currsize:
+        get_http_client().close()
+
+@app.on_event("shutdown")
+async def stop_log_listener():
+    """Log directly again and flush pending log records"""
+    logging.basicConfig(level=LOG_LEVEL, handlers=[log_handler], force=True)
+    log_listener.stop()
+
 # Pydantic models
 class HealthResponse(BaseModel):
     status: str
@@ -68,7 +147,6 @@ async def chat(request: ChatRequest):
     # This is a placeholder - you'll implement the actual AI logic here
     response_text = f"Hello! You said: '{request.message}'. This is a placeholder response from RICA."
     
-    from datetime import datetime
     return ChatResponse(
         response=response_text,
         user_id=request.user_id,
@@ -86,6 +164,7 @@ async def api_status():
             "/health",
             "/chat",
             "/manager/ask",
+            "/manager/ask/stream",
             "/docs",
             "/redoc"
         ]
@@ -100,12 +179,23 @@ async def not_found_handler(request, exc):
 async def internal_error_handler(request, exc):
     return {"error": "Internal server error", "detail": "An unexpected error occurred"}
 
-if __name__ == "__main__":
-    # Run with uvicorn when script is executed directly
+def run():
+    """Start the API with uvicorn (`rica` console script, development)"""
+    # Production runs under gunicorn, see gunicorn.conf.py
+    debug = os.getenv("DEBUG", "false").lower() == "true"
+    workers = int(os.getenv("WEB_CONCURRENCY") or 1)
     uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,  # Enable auto-reload for development
+        "app.main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8000")),
+        # uvloop/httptools are picked up when installed (uvicorn[standard])
+        loop="auto",
+        http="auto",
+        # Auto-reload only in development; it is incompatible with workers
+        reload=debug,
+        workers=1 if debug else workers,
         log_level="info"
     )
+
+if __name__ == "__main__":
+    run()
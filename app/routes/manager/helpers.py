@@ -1,4 +1,21 @@
+import hashlib
+import os
+import re
+import time
+from collections import OrderedDict
 
+# Per-process response cache for repeated inquiries
+ASK_CACHE_TTL = int(os.getenv("ASK_CACHE_TTL", "3600"))
+ASK_CACHE_SIZE = int(os.getenv("ASK_CACHE_SIZE", "1024"))
+_response_cache = OrderedDict()
+
+# Bare greetings are answered locally without an LLM round trip
+GREETING_PATTERN = re.compile(
+    r"^(hi|hello|hey|yo|hola|sup|hiya|howdy|good (morning|afternoon|evening))"
+    r"( there| rica)?[\s!.?]*$",
+    re.IGNORECASE,
+)
+GREETING_RESPONSE = "Hey! What can I help you with?"
 
 
 def get_inquirer_name():
@@ -10,3 +27,66 @@ def get_inquirer_name():
     """
     return "Siam"
 
+
+def is_greeting(query_text):
+    """
+    Check whether the query is just a greeting.
+
+    Args:
+        query_text (str): The raw query text
+
+    Returns:
+        bool: True if the query is a bare greeting
+    """
+    return GREETING_PATTERN.match(query_text.strip()) is not None
+
+
+def get_cache_key(inquirer, query_text, namespace="ask"):
+    """
+    Build the cache key for an inquiry.
+
+    Args:
+        inquirer (str): The inquirer's name
+        query_text (str): The raw query text
+        namespace (str): Keeps answers from different endpoints apart
+
+    Returns:
+        str: SHA-256 hex digest of the namespace, inquirer and normalized query
+    """
+    normalized = query_text.strip().lower()
+    return hashlib.sha256(f"{namespace}|{inquirer}|{normalized}".encode()).hexdigest()
+
+
+def get_cached_response(key):
+    """
+    Look up a cached response.
+
+    Args:
+        key (str): Cache key from get_cache_key
+
+    Returns:
+        str | None: The cached response, or None on a miss or expiry
+    """
+    entry = _response_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, response = entry
+    if expires_at < time.monotonic():
+        del _response_cache[key]
+        return None
+    _response_cache.move_to_end(key)
+    return response
+
+
+def cache_response(key, response):
+    """
+    Store a response, evicting the least recently used entry when full.
+
+    Args:
+        key (str): Cache key from get_cache_key
+        response (str): The response text to cache
+    """
+    _response_cache[key] = (time.monotonic() + ASK_CACHE_TTL, response)
+    _response_cache.move_to_end(key)
+    while len(_response_cache) > ASK_CACHE_SIZE:
+        _response_cache.popitem(last=False)
@@ -1,12 +1,16 @@
 """
-Pydantic models for manager routes
+msgspec models for manager routes
 """
 
-from pydantic import BaseModel
+import msgspec
 
-class AskRequest(BaseModel):
+class AskRequest(msgspec.Struct):
     query_text: str
 
-class AskResponse(BaseModel):
+class AskResponse(msgspec.Struct):
     response: str
     original_query: str
+
+# Built once; reused for every request
+ask_request_decoder = msgspec.json.Decoder(AskRequest)
+json_encoder = msgspec.json.Encoder()
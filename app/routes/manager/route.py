@@ -2,35 +2,122 @@
 Manager routes for RICA API
 """
 
-from fastapi import APIRouter
-from .models import AskRequest, AskResponse
+import asyncio
+import os
 
-from .helpers import get_inquirer_name
+import msgspec
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from .models import AskResponse, ask_request_decoder, json_encoder
 
-from app.crews.qna import qna_crew
+from .helpers import (
+    GREETING_RESPONSE,
+    cache_response,
+    get_cache_key,
+    get_cached_response,
+    get_inquirer_name,
+    is_greeting,
+)
+
+from app.crews.qna import run_qna, stream_qna
 
 # Create router instance
 router = APIRouter(prefix="/manager", tags=["manager"])
 
-@router.post("/ask", response_model=AskResponse)
-async def ask(request: AskRequest):
+# Cap concurrent crew runs so bursts don't exceed Groq rate limits
+MAX_CONCURRENT_LLM_CALLS = int(os.getenv("MAX_CONCURRENT_LLM_CALLS", "4"))
+llm_semaphore = asyncio.Semaphore(MAX_CONCURRENT_LLM_CALLS)
+
+# Deadline for one crew run; a stuck run must not hold its slot forever
+CREW_TIMEOUT = float(os.getenv("CREW_TIMEOUT", "120"))
+
+async def decode_ask_request(request):
+    """Decode and validate an AskRequest body"""
+    try:
+        return ask_request_decoder.decode(await request.body())
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+def ask_response(response, query_text):
+    """Encode an AskResponse straight to a JSON response"""
+    body = AskResponse(response=response, original_query=query_text)
+    return Response(
+        content=json_encoder.encode(body),
+        media_type="application/json"
+    )
+
+@router.post("/ask")
+async def ask(request: Request):
     """
     Ask endpoint that echoes back the query_text
     """
-    query_text = request.query_text
+    query_text = (await decode_ask_request(request)).query_text
+
+    if is_greeting(query_text):
+        return ask_response(GREETING_RESPONSE, query_text)
     
     # TODO: Add a function to infer if it's actually a qna task
     is_qna_task = True
     
     if is_qna_task:
         inquirer_name = get_inquirer_name()
-        inputs = {
-            "inquirer": f"{inquirer_name}",
-            "inquiry": f"{query_text}"
-        }
-        result = qna_crew.kickoff(inputs=inputs)
-
-    return AskResponse(
-        response=result.raw if hasattr(result, 'raw') else str(result),
-        original_query=request.query_text
+
+        # Repeated inquiries are served from cache without an LLM call
+        cache_key = get_cache_key(inquirer_name, query_text)
+        response = get_cached_response(cache_key)
+
+        if response is None:
+            async with llm_semaphore:
+                try:
+                    # The crew threads can't be cancelled, but the slot is freed
+                    response = await asyncio.wait_for(
+                        run_qna(inquirer_name, query_text),
+                        timeout=CREW_TIMEOUT
+                    )
+                except asyncio.TimeoutError:
+                    raise HTTPException(status_code=504, detail="The assistant took too long to answer")
+            cache_response(cache_key, response)
+
+    return ask_response(response, query_text)
+
+
+def format_event(delta):
+    """Encode a content delta as a server-sent event"""
+    return b"data: " + json_encoder.encode({"delta": delta}) + b"\n\n"
+
+async def stream_answer_events(query_text):
+    if is_greeting(query_text):
+        yield format_event(GREETING_RESPONSE)
+        return
+
+    inquirer_name = get_inquirer_name()
+    # The single-call stream answers differently from the crew, so its
+    # answers are cached apart from /ask's
+    cache_key = get_cache_key(inquirer_name, query_text, namespace="stream")
+    response = get_cached_response(cache_key)
+    if response is not None:
+        yield format_event(response)
+        return
+
+    chunks = []
+    async with llm_semaphore:
+        async for delta in stream_qna(inquirer_name, query_text):
+            chunks.append(delta)
+            yield format_event(delta)
+
+    # Only reached when the client read the whole answer
+    if chunks:
+        cache_response(cache_key, "".join(chunks))
+
+@router.post("/ask/stream")
+async def ask_stream(request: Request):
+    """
+    Streaming variant of /ask that sends the answer as server-sent events
+    """
+    query_text = (await decode_ask_request(request)).query_text
+    return StreamingResponse(
+        stream_answer_events(query_text),
+        media_type="text/event-stream",
+        # GZipMiddleware buffers its output; a set encoding makes it pass through
+        headers={"Content-Encoding": "identity"}
     )
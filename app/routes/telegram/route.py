@@ -1,18 +1,159 @@
+import asyncio
 import os
 import httpx
 import logging
+import orjson
 from fastapi import APIRouter, Request, BackgroundTasks, HTTPException
-from app.routes.manager.models import AskRequest, AskResponse
 
 logger = logging.getLogger(__name__)
 
 TELEGRAM_TOKEN = os.environ["TELEGRAM_TOKEN"]
 BOT_API = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}"
 AGENT_ENDPOINT = os.environ["NGROK_URL"]
-QUERY_ENDPOINT = f"{AGENT_ENDPOINT}/manager/ask"
+# Telegram uses the streaming pipeline (stream_qna), not the /ask crew: one
+# direct Groq call with the crew's persona and instructions, so replies can
+# start early. It is bounded by ANSWER_TIMEOUT rather than CREW_TIMEOUT and
+# cached apart from /ask answers.
+QUERY_ENDPOINT = f"{AGENT_ENDPOINT}/manager/ask/stream"
 
 router = APIRouter(prefix="/telegram", tags=["telegram"])
 
+# Messages from one chat arriving within this window are answered together
+DEBOUNCE_SECONDS = float(os.getenv("TELEGRAM_DEBOUNCE_SECONDS", "0.4"))
+
+# Backpressure: cap concurrent agent calls and chats waiting for one
+MAX_PARALLEL_AGENTS = int(os.getenv("TELEGRAM_MAX_PARALLEL_AGENTS", "8"))
+MAX_PENDING_CHATS = int(os.getenv("TELEGRAM_MAX_PENDING_CHATS", "64"))
+REQUEST_TIMEOUT = float(os.getenv("TELEGRAM_TIMEOUT", "30"))
+ANSWER_TIMEOUT = float(os.getenv("TELEGRAM_ANSWER_TIMEOUT", "60"))
+
+# Minimum gap between edits of a streamed reply, to respect Telegram rate limits
+EDIT_INTERVAL_SECONDS = float(os.getenv("TELEGRAM_EDIT_INTERVAL_SECONDS", "1"))
+agent_semaphore = asyncio.Semaphore(MAX_PARALLEL_AGENTS)
+
+# Long-lived client so updates reuse keepalive connections to Telegram and the agent
+CLIENT = httpx.AsyncClient(
+    timeout=REQUEST_TIMEOUT,
+    http2=True,
+    limits=httpx.Limits(max_keepalive_connections=50, max_connections=100),
+)
+
+# Pending messages per chat, each drained by a single consumer task
+chat_queues: dict[int, asyncio.Queue] = {}
+chat_consumers: set[asyncio.Task] = set()
+
+
+async def warm_up():
+    # Open the keep-alive connection to the Bot API ahead of the first update
+    resp = await CLIENT.get(f"{BOT_API}/getMe")
+    resp.raise_for_status()
+
+
+async def send_message(chat_id: int, text: str) -> httpx.Response:
+    return await CLIENT.post(
+        f"{BOT_API}/sendMessage",
+        json={"chat_id": chat_id, "text": text},
+    )
+
+
+async def edit_message(chat_id: int, message_id: int, text: str) -> httpx.Response:
+    payload = {"chat_id": chat_id, "message_id": message_id, "text": text}
+    resp = await CLIENT.post(f"{BOT_API}/editMessageText", json=payload)
+    if resp.status_code == 429:
+        # Flood control: wait as long as Telegram asks, then retry once
+        retry_after = orjson.loads(resp.content).get("parameters", {}).get("retry_after", 1)
+        logger.warning("Telegram rate limited edits, retrying in %ss", retry_after)
+        await asyncio.sleep(retry_after)
+        resp = await CLIENT.post(f"{BOT_API}/editMessageText", json=payload)
+    resp.raise_for_status()
+    return resp
+
+
+async def send_typing(chat_id: int):
+    # Typing indicator is cosmetic, never fail the update over it
+    try:
+        await CLIENT.post(
+            f"{BOT_API}/sendChatAction",
+            json={"chat_id": chat_id, "action": "typing"},
+        )
+    except Exception as e:
+        logger.warning("Failed to send typing action to Telegram: %s", e)
+
+
+async def stream_agent(user_text: str):
+    # Plain payload; /manager/ask/stream validates it at the route boundary
+    payload = {"query_text": user_text}
+    
+    logger.debug("Sending request to: %s", QUERY_ENDPOINT)
+    logger.debug("Request payload: %s", payload)
+
+    # Send to agent backend; identity encoding so gzip can't buffer the stream
+    async with CLIENT.stream(
+        "POST",
+        QUERY_ENDPOINT,
+        json=payload,
+        headers={"Accept-Encoding": "identity"},
+    ) as resp:
+        logger.debug("Response status: %s", resp.status_code)
+        resp.raise_for_status()
+
+        async for line in resp.aiter_lines():
+            if line.startswith("data: "):
+                yield orjson.loads(line[6:])["delta"]
+
+
+async def relay_answer(chat_id: int, user_text: str):
+    # Post the reply on the first delta, then edit it in place as more arrives
+    loop = asyncio.get_running_loop()
+    message_id = None
+    answer = sent = ""
+    last_edit = 0.0
+
+    async for delta in stream_agent(user_text):
+        answer += delta
+        if message_id is None:
+            if not answer.strip():
+                continue
+            resp = await send_message(chat_id, answer)
+            resp.raise_for_status()
+            message_id = orjson.loads(resp.content)["result"]["message_id"]
+            sent, last_edit = answer, loop.time()
+        elif loop.time() - last_edit >= EDIT_INTERVAL_SECONDS:
+            # A failed progress edit is caught up by the next one or the final edit
+            try:
+                await edit_message(chat_id, message_id, answer)
+                sent = answer
+            except httpx.HTTPStatusError as e:
+                logger.warning("Failed to edit Telegram message: %s", e)
+            last_edit = loop.time()
+
+    if message_id is None:
+        raise ValueError("Agent returned an empty response")
+    # Telegram trims surrounding whitespace and rejects edits that don't change
+    # the visible text, so compare what it would actually show
+    if answer.strip() != sent.strip():
+        # Raises so answer_chat tells the user when the full answer didn't land
+        await edit_message(chat_id, message_id, answer)
+
+
+async def drain_chat(chat_id: int, queue: asyncio.Queue):
+    try:
+        while not queue.empty():
+            # Collect the burst until the chat goes quiet for the debounce window
+            texts = [queue.get_nowait()]
+            while True:
+                try:
+                    text = await asyncio.wait_for(queue.get(), timeout=DEBOUNCE_SECONDS)
+                    texts.append(text)
+                except asyncio.TimeoutError:
+                    break
+
+            async with agent_semaphore:
+                await answer_chat(chat_id, "\n".join(texts))
+    finally:
+        # No await between the empty check and here, so nothing can be lost
+        chat_queues.pop(chat_id, None)
+
 
 async def process_update(update: dict):
     message = update.get("message")
@@ -20,47 +161,44 @@ async def process_update(update: dict):
         return
 
     chat_id = message["chat"]["id"]
-    user_text = message["text"]
-
-    try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            # Construct request
-            ask_request = AskRequest(query_text=user_text)
-            
-            logger.info(f"Sending request to: {QUERY_ENDPOINT}")
-            logger.info(f"Request payload: {ask_request.model_dump()}")
-
-            # Send to agent backend
-            resp = await client.post(
-                QUERY_ENDPOINT,
-                json=ask_request.model_dump(),
-            )
-            logger.info(f"Response status: {resp.status_code}")
-            resp.raise_for_status()
+    queue = chat_queues.get(chat_id)
+    if queue is None and len(chat_queues) >= MAX_PENDING_CHATS:
+        # Shed load instead of piling up work we can't serve in time
+        try:
+            await send_message(chat_id, "⏳ I'm a bit busy right now. Please try again in a moment.")
+        except Exception as e:
+            logger.error("Failed to send busy message to Telegram: %s", e)
+        return
+    if queue is None:
+        # The consumer only starts running after this message is queued
+        queue = chat_queues[chat_id] = asyncio.Queue()
+        task = asyncio.create_task(drain_chat(chat_id, queue))
+        chat_consumers.add(task)
+        task.add_done_callback(chat_consumers.discard)
+    queue.put_nowait(message["text"])
 
-            # Parse response safely
-            response_data = AskResponse(**resp.json())
-            answer = response_data.response
 
-            # Send reply back to Telegram
-            await client.post(
-                f"{BOT_API}/sendMessage",
-                json={"chat_id": chat_id, "text": answer},
-            )
+async def answer_chat(chat_id: int, user_text: str):
+    try:
+        # Overlap the Telegram round trip with the agent call, under one
+        # deadline that cancels both (and closes the stream) on expiry
+        await asyncio.wait_for(
+            asyncio.gather(
+                send_typing(chat_id),
+                relay_answer(chat_id, user_text),
+            ),
+            timeout=ANSWER_TIMEOUT,
+        )
 
     except Exception as e:
-        logger.error(f"Error processing telegram message: {e}")
-        logger.error(f"Query endpoint: {QUERY_ENDPOINT}")
+        logger.error("Error processing telegram message: %r", e)
+        logger.error("Query endpoint: %s", QUERY_ENDPOINT)
         
         # Send fallback error message to user
         try:
-            async with httpx.AsyncClient() as client:
-                await client.post(
-                    f"{BOT_API}/sendMessage",
-                    json={"chat_id": chat_id, "text": "⚠️ Something went wrong. Please try again."},
-                )
+            await send_message(chat_id, "⚠️ Something went wrong. Please try again.")
         except Exception as telegram_error:
-            logger.error(f"Failed to send error message to Telegram: {telegram_error}")
+            logger.error("Failed to send error message to Telegram: %s", telegram_error)
         
         # Don't re-raise to avoid crashing the webhook handler
         # raise e
@@ -69,8 +207,8 @@ async def process_update(update: dict):
 @router.post("/webhook")
 async def telegram_webhook(request: Request, background_tasks: BackgroundTasks):
     try:
-        update = await request.json()
-    except Exception:
+        update = orjson.loads(await request.body())
+    except orjson.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Invalid request body")
 
     background_tasks.add_task(process_update, update)
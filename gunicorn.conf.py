@@ -0,0 +1,23 @@
+"""
+Gunicorn configuration for running RICA in production
+
+Usage:
+    gunicorn app.main:app -c gunicorn.conf.py
+
+`rica` / `python -m app.main` (plain uvicorn) is meant for development only.
+"""
+
+import multiprocessing
+import os
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8000')}"
+
+# 2n+1 uvicorn workers for multi-core concurrency on the crew path
+workers = int(os.getenv("WEB_CONCURRENCY") or 2 * multiprocessing.cpu_count() + 1)
+worker_class = "uvicorn.workers.UvicornWorker"
+keepalive = 5
+
+# Import crewai/groq once in the master and share it copy-on-write
+preload_app = True
+
+loglevel = os.getenv("LOG_LEVEL", "info").lower()